@@ -6,23 +6,87 @@ Two options: 1) Page 8 only, 2) Whole PDF
 
 
 import pdfplumber
+import pymupdf
 import pandas as pd
+import numpy as np
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache, partial
+from itertools import groupby
 import os
 import re
 
+from numeric_columns import convert_numeric_columns
+
+
+# Smallest run of pages worth handing to a separate worker process
+PAGES_PER_WORKER = 8
+
+# Standard-schema columns that are right-aligned and get a thousands format
+NUMERIC_COLUMNS = {'2022', '2023', '2024', '2022_check', '2023_check', '2024_check',
+                   'base_factor', 'display_power_factor'}
+
+# Output formats create_single_sheet_excel can write
+OUTPUT_FORMATS = ("xlsx", "csv", "parquet")
+
+# Standard-schema columns that are always filled with whole numbers
+INTEGER_COLUMNS = {'primary_key', 'doc_page_num', 'file_page_num', 'indentation', 'process_flag',
+                   'base_factor', 'display_power_factor', 'cumulative_periods'}
+
+
+def _find_page_tables(pdf_path, page_numbers):
+    """Raw tables for the given 1-based pages, opening the PDF once (module-level so worker processes can run it)"""
+    with pymupdf.open(pdf_path) as doc:
+        # lines_strict only builds tables from drawn ruling lines (not filled background boxes), so prose pages
+        # come back empty after the vector-graphics scan and nothing is extracted from them
+        return [[table.extract() for table in doc[n - 1].find_tables(strategy="lines_strict").tables]
+                for n in page_numbers]
+
+
+@lru_cache(maxsize=None)
+def _get_styles():
+    """Build the workbook's named styles once per process"""
+    header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=10)
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    left_align = Alignment(horizontal='left', vertical='center', wrap_text=True)
+    right_align = Alignment(horizontal='right', vertical='center')
+    
+    return (
+        # Only the header row is bordered; body cells rely on the sheet gridlines
+        NamedStyle(name='header', fill=header_fill, font=header_font, border=border, alignment=center_align),
+        NamedStyle(name='num_body', alignment=right_align, number_format='#,##0'),
+        NamedStyle(name='num_text', alignment=right_align),
+        NamedStyle(name='txt_body', alignment=left_align),
+    )
 
 
 class FinancialStatementExtractorSingleSheet:
     
-    def __init__(self, pdf_path: str, output_path: str = "financial_statements.xlsx"):
+    def __init__(self, pdf_path: str, output_path: str = "financial_statements.xlsx", output_format: str = "xlsx"):
         self.pdf_path = pdf_path
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+        self.output_format = output_format  # "xlsx", or "csv"/"parquet" for machine consumers (no Excel styling)
+        
+        # Keep the file suffix in step with the format, so csv/parquet never land in a .xlsx name
+        root, ext = os.path.splitext(output_path)
+        if ext.lower() != f".{output_format}":
+            output_path = f"{root}.{output_format}"
         self.output_path = output_path
         self.extracted_tables = []
         self.table_metadata = []
+        self._page_table_cache = {}  # page_num -> raw tables, so re-reading a page is free
         
         # Standardized columns
         self.standard_columns = [
@@ -47,16 +111,48 @@ class FinancialStatementExtractorSingleSheet:
         print(f"🔄 Opening PDF: {self.pdf_path}")
         print(f"📄 Extracting Page 8 only (Consolidated Statement of Changes in Equity)")
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            if len(pdf.pages) < 8:
-                print(f"❌ PDF has only {len(pdf.pages)} pages. Page 8 not available!")
-                return self.extracted_tables
-            
-            page_num = 8  # Page 8 in 1-based indexing
-            page = pdf.pages[page_num - 1]  # Convert to 0-based indexing
-            
-            tables = page.extract_tables()
+        page_num = 8  # Page 8 in 1-based indexing
+        page_count, page_tables = self._read_page_tables([page_num])
+        
+        if page_count < 8:
+            print(f"❌ PDF has only {page_count} pages. Page 8 not available!")
+            return self.extracted_tables
+        
+        tables = page_tables[0][1]
+        
+        if tables:
+            print(f"📊 Found {len(tables)} table(s) on page {page_num}")
             
+            for table_idx, table in enumerate(tables):
+                df = self._convert_table_to_dataframe(table)
+                
+                if df is not None and not df.empty:
+                    self.extracted_tables.append(df)
+                    self.table_metadata.append({
+                        'page': page_num,
+                        'table_index': table_idx,
+                        'rows': len(df),
+                        'columns': len(df.columns),
+                        'title': f"Consolidated Statement of Changes in Equity - Table {table_idx + 1}"
+                    })
+                    print(f"✅ Table {len(self.extracted_tables)}: {len(df)} rows × {len(df.columns)} columns")
+        else:
+            print(f"⚠️ No tables found on page {page_num}")
+        
+        return self.extracted_tables
+    
+    # ============================================================================
+    # OPTION 2: EXTRACT WHOLE PDF
+    # ============================================================================
+    
+    def extract_all_tables(self):
+        """Extract all tables from entire PDF"""
+        print(f"🔄 Opening PDF: {self.pdf_path}")
+        
+        page_count, page_tables = self._read_page_tables()
+        print(f"📄 Total pages: {page_count}")
+        
+        for page_num, tables in page_tables:
             if tables:
                 print(f"📊 Found {len(tables)} table(s) on page {page_num}")
                 
@@ -69,50 +165,55 @@ class FinancialStatementExtractorSingleSheet:
                             'page': page_num,
                             'table_index': table_idx,
                             'rows': len(df),
-                            'columns': len(df.columns),
-                            'title': f"Consolidated Statement of Changes in Equity - Table {table_idx + 1}"
+                            'columns': len(df.columns)
                         })
-                        print(f"✅ Table {len(self.extracted_tables)}: {len(df)} rows × {len(df.columns)} columns")
-            else:
-                print(f"⚠️ No tables found on page {page_num}")
+                        print(f"✅ Table {len(self.extracted_tables)}: Page {page_num}, {len(df)} rows × {len(df.columns)} columns")
         
         return self.extracted_tables
     
     # ============================================================================
-    # OPTION 2: EXTRACT WHOLE PDF
+    # HELPER METHODS
     # ============================================================================
     
-    def extract_all_tables(self):
-        """Extract all tables from entire PDF"""
-        print(f"🔄 Opening PDF: {self.pdf_path}")
+    def _read_page_tables(self, page_numbers=None):
+        """
+        Read raw tables (lists of rows) from the given 1-based pages, or every page
+        Returns (page_count, [(page_num, tables), ...])
+        Uses PyMuPDF's C table finder; pdfplumber is only the fallback when PyMuPDF can't read the file
+        Pages already read by this extractor are served from self._page_table_cache
+        """
+        cache = self._page_table_cache
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            print(f"📄 Total pages: {len(pdf.pages)}")
+        # Only a file PyMuPDF can't open falls back to pdfplumber; errors while finding tables propagate
+        try:
+            with pymupdf.open(self.pdf_path) as doc:
+                page_count = doc.page_count
+        except (pymupdf.FileDataError, RuntimeError) as e:
+            print(f"⚠️ PyMuPDF could not read the PDF ({e}), falling back to pdfplumber")
             
-            for page_num, page in enumerate(pdf.pages, 1):
-                tables = page.extract_tables()
-                
-                if tables:
-                    print(f"📊 Found {len(tables)} table(s) on page {page_num}")
-                    
-                    for table_idx, table in enumerate(tables):
-                        df = self._convert_table_to_dataframe(table)
-                        
-                        if df is not None and not df.empty:
-                            self.extracted_tables.append(df)
-                            self.table_metadata.append({
-                                'page': page_num,
-                                'table_index': table_idx,
-                                'rows': len(df),
-                                'columns': len(df.columns)
-                            })
-                            print(f"✅ Table {len(self.extracted_tables)}: Page {page_num}, {len(df)} rows × {len(df.columns)} columns")
+            with pdfplumber.open(self.pdf_path) as pdf:
+                page_count = len(pdf.pages)
+                pages = range(1, page_count + 1) if page_numbers is None else [n for n in page_numbers if n <= page_count]
+                for n in pages:
+                    if n not in cache:
+                        cache[n] = pdf.pages[n - 1].extract_tables()
+                return page_count, [(n, cache[n]) for n in pages]
         
-        return self.extracted_tables
-    
-    # ============================================================================
-    # HELPER METHODS
-    # ============================================================================
+        pages = list(range(1, page_count + 1)) if page_numbers is None else [n for n in page_numbers if n <= page_count]
+        missing = [n for n in pages if n not in cache]
+        
+        # Pages are independent: split larger PDFs into runs of pages across processes
+        n_workers = min(os.cpu_count() or 1, -(-len(missing) // PAGES_PER_WORKER))
+        if n_workers <= 1:
+            tables = _find_page_tables(self.pdf_path, missing)
+        else:
+            run_length = -(-len(missing) // n_workers)
+            runs = [missing[start:start + run_length] for start in range(0, len(missing), run_length)]
+            with ProcessPoolExecutor(max_workers=len(runs)) as executor:
+                tables = [page for run in executor.map(partial(_find_page_tables, self.pdf_path), runs) for page in run]
+        cache.update(zip(missing, tables))
+        
+        return page_count, [(n, cache[n]) for n in pages]
     
     def _convert_table_to_dataframe(self, table):
         """Convert raw table to DataFrame"""
@@ -122,19 +223,21 @@ class FinancialStatementExtractorSingleSheet:
         try:
             headers = table[0]
             data_rows = table[1:]
-            data_rows = [row for row in data_rows if any(cell for cell in row)]
-            
-            if not data_rows:
-                return None
             
+            # Pad short rows with "" (and cut long ones) into one preallocated object array
             max_cols = len(headers)
-            padded_rows = []
-            for row in data_rows:
-                while len(row) < max_cols:
-                    row.append("")
-                padded_rows.append(row[:max_cols])
+            arr = np.full((len(data_rows), max_cols), "", dtype=object)
+            for i, row in enumerate(data_rows):
+                n = min(len(row), max_cols)
+                arr[i, :n] = row[:n]
             
-            df = pd.DataFrame(padded_rows, columns=headers)
+            # Drop rows with no content in one pass over the array
+            arr = arr[(pd.notna(arr) & (arr != "")).any(axis=1)]
+            
+            if not len(arr):
+                return None
+            
+            df = pd.DataFrame(arr, columns=headers)
             df = self._clean_dataframe(df)
             
             return df
@@ -146,16 +249,18 @@ class FinancialStatementExtractorSingleSheet:
         """Clean DataFrame"""
         df = df.dropna(how='all')
         df = df.dropna(axis=1, how='all')
-        df = df.map(lambda x: x.strip() if isinstance(x, str) else x)
+        # Strip text columns with the vectorized .str accessor instead of a per-cell lambda
+        for col_idx in range(df.shape[1]):
+            col = df.iloc[:, col_idx]
+            if pd.api.types.infer_dtype(col, skipna=True) == 'string':
+                df.isetitem(col_idx, col.str.strip())
         df = df.replace('', None)
         
         return df.reset_index(drop=True)
     
     def convert_numeric_columns(self):
         """Convert numeric columns"""
-        for df in self.extracted_tables:
-            for col in df.columns:
-                df[col] = df[col].apply(lambda x: self._convert_to_numeric(x))
+        convert_numeric_columns(self.extracted_tables, self._convert_to_numeric)
     
     def _convert_to_numeric(self, value):
         """
@@ -214,178 +319,160 @@ class FinancialStatementExtractorSingleSheet:
         """
         print(f"\n📝 Transforming {len(self.extracted_tables)} table(s) to standardized schema...")
         
-        transformed_data = []
-        primary_key_counter = 1
+        # Preallocate one typed array per output column and fill it in place;
+        # object arrays start out as None, so empty fields need no work
+        total_rows = sum(len(df) for df in self.extracted_tables)
+        arrays = {col: np.empty(total_rows, dtype=np.int64 if col in INTEGER_COLUMNS else object)
+                  for col in self.standard_columns}
         
+        # Set standard fields
+        today = datetime.now().strftime('%Y-%m-%d')
+        arrays['primary_key'][:] = np.arange(1, total_rows + 1)
+        arrays['date_last_updated'][:] = today
+        arrays['published_date'][:] = today
+        arrays['reported_date'][:] = '2024-12-31'  # Adjust based on your PDF
+        arrays['country'][:] = 'PL'  # Poland - adjust based on your data
+        arrays['source_metric_name'][:] = "PDF_Extracted"
+        
+        # Processing fields
+        arrays['indentation'][:] = 0
+        arrays['process_flag'][:] = 1
+        arrays['base_factor'][:] = 1
+        arrays['display_power_factor'][:] = 0
+        arrays['data_frequency'][:] = 'Annual'
+        arrays['aggregation_method'][:] = 'Sum'
+        arrays['unit'][:] = 'PLN'
+        arrays['unit_type'][:] = 'Thousands'
+        arrays['cumulative_periods'][:] = 1
+        
+        offset = 0
         for table_idx, (df, metadata) in enumerate(zip(self.extracted_tables, self.table_metadata)):
             print(f"\n📊 Processing Table {table_idx + 1} (Page {metadata['page']})")
             
-            # Initialize row data with standard columns
-            for row_idx, row in enumerate(df.itertuples(index=False)):
-                row_data = {}
-                
-                # Set standard fields
-                row_data['primary_key'] = primary_key_counter
-                row_data['date_last_updated'] = datetime.now().strftime('%Y-%m-%d')
-                row_data['published_date'] = datetime.now().strftime('%Y-%m-%d')
-                row_data['reported_date'] = '2024-12-31'  # Adjust based on your PDF
-                row_data['doc_page_num'] = metadata['page']
-                row_data['file_page_num'] = metadata['page']
-                row_data['table_id'] = f"TABLE_{table_idx + 1:03d}"
-                row_data['country'] = 'PL'  # Poland - adjust based on your data
-                
-                # Geography (optional - fill if available)
-                row_data['geo_1_id'] = None
-                row_data['geo_1_name'] = None
-                row_data['geo_1_type'] = None
-                row_data['geo_2_id'] = None
-                row_data['geo_2_name'] = None
-                row_data['geo_2_type'] = None
-                
-                # Dimensions - map extracted columns to dimensions
-                extracted_cols = list(row)
-                
-                # Try to map first few columns to dimensions
-                if len(extracted_cols) > 0:
-                    row_data['dim_1_id'] = f"DIM1_{table_idx}_{row_idx}"
-                    row_data['dim_1_name'] = str(extracted_cols[0])
-                else:
-                    row_data['dim_1_id'] = None
-                    row_data['dim_1_name'] = None
-                
-                if len(extracted_cols) > 1:
-                    row_data['dim_2_id'] = f"DIM2_{table_idx}_{row_idx}"
-                    row_data['dim_2_name'] = str(extracted_cols[1])
-                else:
-                    row_data['dim_2_id'] = None
-                    row_data['dim_2_name'] = None
-                
-                if len(extracted_cols) > 2:
-                    row_data['dim_3_id'] = f"DIM3_{table_idx}_{row_idx}"
-                    row_data['dim_3_name'] = str(extracted_cols[2])
-                else:
-                    row_data['dim_3_id'] = None
-                    row_data['dim_3_name'] = None
-                
-                if len(extracted_cols) > 3:
-                    row_data['dim_4_id'] = f"DIM4_{table_idx}_{row_idx}"
-                    row_data['dim_4_name'] = str(extracted_cols[3])
-                else:
-                    row_data['dim_4_id'] = None
-                    row_data['dim_4_name'] = None
-                
-                # Metric fields
-                row_data['metric_id'] = f"METRIC_{table_idx}_{row_idx}"
-                row_data['metric_name'] = f"Value_{row_idx}"
-                row_data['source_metric_id'] = f"SOURCE_{table_idx}_{row_idx}"
-                row_data['source_metric_name'] = "PDF_Extracted"
-                
-                # Processing fields
-                row_data['indentation'] = 0
-                row_data['process_flag'] = 1
-                row_data['base_factor'] = 1
-                row_data['display_power_factor'] = 0
-                row_data['data_frequency'] = 'Annual'
-                row_data['aggregation_method'] = 'Sum'
-                row_data['unit'] = 'PLN'
-                row_data['unit_type'] = 'Thousands'
-                
-                # Notes
-                row_data['note_id'] = None
-                row_data['note_reference'] = None
-                row_data['cumulative_periods'] = 1
-                row_data['comments'] = f"Extracted from page {metadata['page']}"
-                
-                # Year data - try to extract 2022, 2023, 2024 values
-                year_columns = ['2022', '2023', '2024']
-                year_check_columns = ['2022_check', '2023_check', '2024_check']
-                
-                for year_col in year_columns:
-                    row_data[year_col] = None
-                    row_data[f'{year_col}_check'] = None
-                
-                # Try to find year columns in extracted data
-                if len(extracted_cols) >= 4:
-                    row_data['2024'] = extracted_cols[-1] if len(extracted_cols) > 3 else None
-                if len(extracted_cols) >= 5:
-                    row_data['2023'] = extracted_cols[-2] if len(extracted_cols) > 4 else None
-                if len(extracted_cols) >= 6:
-                    row_data['2022'] = extracted_cols[-3] if len(extracted_cols) > 5 else None
-                
-                # Additional fields
-                row_data['check_sum'] = None
-                row_data['concat'] = None
-                row_data['formula'] = None
-                
-                transformed_data.append(row_data)
-                primary_key_counter += 1
+            n = len(df)
+            n_cols = len(df.columns)
+            page = metadata['page']
+            rows = slice(offset, offset + n)
+            row_ids = np.arange(n).astype(str)
+            
+            arrays['doc_page_num'][rows] = page
+            arrays['file_page_num'][rows] = page
+            arrays['table_id'][rows] = f"TABLE_{table_idx + 1:03d}"
+            
+            # Dimensions - map the first few extracted columns to dimensions
+            for i in range(1, min(n_cols, 4) + 1):
+                arrays[f'dim_{i}_id'][rows] = np.char.add(f"DIM{i}_{table_idx}_", row_ids)
+                arrays[f'dim_{i}_name'][rows] = df.iloc[:, i - 1].map(str).to_numpy(dtype=object)
+            
+            # Metric fields
+            arrays['metric_id'][rows] = np.char.add(f"METRIC_{table_idx}_", row_ids)
+            arrays['metric_name'][rows] = np.char.add("Value_", row_ids)
+            arrays['source_metric_id'][rows] = np.char.add(f"SOURCE_{table_idx}_", row_ids)
+            arrays['comments'][rows] = f"Extracted from page {page}"
+            
+            # Year data - 2024, 2023, 2022 come from the last three extracted columns
+            for year, offset_col, min_cols in [('2024', -1, 4), ('2023', -2, 5), ('2022', -3, 6)]:
+                if n_cols >= min_cols:
+                    arrays[year][rows] = df.iloc[:, offset_col].to_numpy(dtype=object)
+            
+            offset += n
+        
+        # Create DataFrame with standard columns; infer_objects gives the year columns
+        # the same float dtype (blank -> NaN) the old row-by-row build ended up with
+        result_df = pd.DataFrame(arrays, columns=self.standard_columns, copy=False).infer_objects()
         
-        # Create DataFrame with standard columns
-        result_df = pd.DataFrame(transformed_data, columns=self.standard_columns)
+        # Columns that repeat one value on every row are stored as categoricals (one small code per row)
+        for col in ['country', 'unit', 'unit_type', 'data_frequency', 'aggregation_method',
+                    'source_metric_name', 'process_flag']:
+            result_df[col] = result_df[col].astype('category')
         
         print(f"✅ Transformed {len(result_df)} rows to standardized schema")
         return result_df
     
+    def create_data_file(self, transformed_df):
+        """Write the standardized data as plain CSV or Parquet instead of Excel"""
+        print(f"\n📝 Creating {self.output_format} file: {self.output_path}")
+        
+        if self.output_format == "parquet":
+            # Parquet columns need one type: keep all-numeric object columns as numbers, the rest as text
+            out = transformed_df.copy(deep=False)
+            for col_idx in range(out.shape[1]):
+                cells = out.iloc[:, col_idx]
+                if cells.dtype != object:
+                    continue
+                values = pd.to_numeric(cells, errors='coerce')
+                out.isetitem(col_idx, values if values.count() == cells.count() else cells.astype("string"))
+            out.to_parquet(self.output_path, engine='pyarrow', compression='snappy', index=False)
+        else:
+            transformed_df.to_csv(self.output_path, index=False)
+        
+        print(f"✅ {self.output_format.upper()} file saved: {self.output_path}")
+        print(f"📊 Total rows: {len(transformed_df)}")
+        print(f"📊 Total columns: {len(transformed_df.columns)}")
+        
+        return self.output_path
+    
     def create_single_sheet_excel(self, transformed_df):
-        """Create Excel file with all data in a SINGLE SHEET"""
+        """Create Excel file with all data in a SINGLE SHEET (or CSV/Parquet when output_format asks for it)"""
+        if self.output_format in ("csv", "parquet"):
+            return self.create_data_file(transformed_df)
+        
         print(f"\n📝 Creating Excel file with single sheet: {self.output_path}")
         
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Consolidated_Data"
-        
-        # Styles
-        header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=10)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        left_align = Alignment(horizontal='left', vertical='center', wrap_text=True)
+        # Write-only workbook: rows are streamed to disk instead of kept as Cell objects
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Consolidated_Data")
+        
+        # Register named styles once; cells then only reference them by name
+        for style in _get_styles():
+            wb.add_named_style(style)
+        
+        # Sheet layout has to be set before the first row is appended
+        # Auto-adjust column widths: longest header vs. longest str() of each column, measured in numpy
+        max_length = np.full(len(transformed_df.columns), max(len(str(header)) for header in transformed_df.columns))
+        if len(transformed_df) > 0:
+            col_max = [np.char.str_len(transformed_df.iloc[:, i].to_numpy(dtype=object).astype(str)).max()
+                       for i in range(len(transformed_df.columns))]
+            max_length = np.maximum(max_length, col_max)
+        adjusted_widths = np.minimum(max_length + 2, 50)
+        
+        # Neighbouring columns of equal width share one <col min..max> entry
+        col_idx = 1
+        for adjusted_width, run in groupby(adjusted_widths.tolist()):
+            span = len(list(run))
+            dim = ws.column_dimensions[get_column_letter(col_idx)]
+            dim.width = adjusted_width
+            dim.min, dim.max = col_idx, col_idx + span - 1
+            col_idx += span
+        
+        # Freeze header row
+        ws.freeze_panes = 'A2'
         
         # Write headers
-        for col_idx, header in enumerate(transformed_df.columns, 1):
-            cell = ws.cell(row=1, column=col_idx)
-            cell.value = header
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.border = border
-            cell.alignment = center_align
+        header_cells = []
+        for header in transformed_df.columns:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.style = 'header'
+            header_cells.append(cell)
+        ws.append(header_cells)
+        
+        # Decide once per column whether it holds numbers
+        is_numeric = [col_name in NUMERIC_COLUMNS for col_name in transformed_df.columns]
         
         # Write data
-        for row_idx, row in enumerate(transformed_df.values, 2):
-            for col_idx, value in enumerate(row, 1):
-                cell = ws.cell(row=row_idx, column=col_idx)
-                cell.value = value
-                cell.border = border
-                
-                # Align based on column type
-                col_name = transformed_df.columns[col_idx - 1]
-                if col_name in ['2022', '2023', '2024', '2022_check', '2023_check', '2024_check', 
-                               'base_factor', 'display_power_factor']:
-                    cell.alignment = Alignment(horizontal='right', vertical='center')
+        for row in transformed_df.itertuples(index=False, name=None):
+            row_cells = []
+            for value, numeric in zip(row, is_numeric):
+                if numeric and pd.isna(value):
+                    value = None  # blank year cells are NaN in the float columns; leave them empty
+                cell = WriteOnlyCell(ws, value=value)
+                if numeric:
                     # Format numbers with thousand separator
-                    if isinstance(value, (int, float)):
-                        cell.number_format = '#,##0'
+                    cell.style = 'num_body' if isinstance(value, (int, float)) else 'num_text'
                 else:
-                    cell.alignment = left_align
-        
-        # Auto-adjust column widths
-        for col_idx, column in enumerate(transformed_df.columns, 1):
-            max_length = max(
-                len(str(header)) for header in transformed_df.columns
-            )
-            if len(transformed_df) > 0:
-                col_max = transformed_df.iloc[:, col_idx - 1].astype(str).map(len).max()
-                max_length = max(max_length, col_max)
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[get_column_letter(col_idx)].width = adjusted_width
-        
-        # Freeze header row
-        ws.freeze_panes = 'A2'
+                    cell.style = 'txt_body'
+                row_cells.append(cell)
+            ws.append(row_cells)
         
         wb.save(self.output_path)
         print(f"✅ Excel file saved: {self.output_path}")
@@ -0,0 +1,14 @@
+import numpy as np
+import pandas as pd
+
+
+def convert_numeric_columns(tables, convert_value):
+    """Run convert_value over every cell of each table, replacing the tables in the list"""
+    # np.frompyfunc calls convert_value per cell without .apply()'s per-column overhead; a
+    # vectorized .str/to_numeric pass was measured slower at every table size these PDFs produce
+    convert = np.frompyfunc(convert_value, 1, 1)
+    for table_idx, df in enumerate(tables):
+        values = convert(df.to_numpy(dtype=object))
+
+        # Infer column dtypes as .apply() did: numbers with None cells become float64 with NaN
+        tables[table_idx] = pd.DataFrame(values, index=df.index, columns=df.columns).infer_objects()
@@ -1,104 +1,322 @@
-import pdfplumber
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from itertools import groupby
+import argparse
+import atexit
+import mmap
 import os
+import re
+
+
+# Row labels that mark total/subtotal rows
+TOTAL_KEYWORDS = ('balance', 'comprehensive', 'payment', 'contribution', 'sale')
+_TOTAL_RE = re.compile('|'.join(TOTAL_KEYWORDS), re.IGNORECASE)
+
+# Ruled-line table detection (page 8 is fully ruled, so no word-alignment fallback is needed)
+TABLE_SETTINGS = {
+    "vertical_strategy": "lines",
+    "horizontal_strategy": "lines",
+    "snap_tolerance": 3,
+    "join_tolerance": 3,
+    "edge_min_length": 10,
+    "intersection_tolerance": 3
+}
+
+# Translation table that turns line breaks and tabs inside a cell into spaces
+_WS_TRANS = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+
+# pdfplumber documents held open by _open_pdfplumber(), keyed by (path, mtime); the least recently
+# used one is closed once more than _PLUMBER_CACHE_SIZE are open, the rest by _close_all()
+_PLUMBER_CACHE_SIZE = 4
+_plumber_docs = OrderedDict()
+
+
+@contextmanager
+def _open_pdf(pdf_path):
+    """Open a PDF through a read-only memory map so only the pages MuPDF touches are read"""
+    import pymupdf
+    
+    with open(pdf_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            with pymupdf.open(stream=view, filetype="pdf") as doc:
+                yield doc
+        finally:
+            view.release()
+
+
+def _open_pdfplumber(pdf_path, mtime):
+    """Open a pdfplumber document once per path; mtime is part of the key so edited files are reparsed"""
+    key = (pdf_path, mtime)
+    if key in _plumber_docs:
+        _plumber_docs.move_to_end(key)
+        return _plumber_docs[key]
+    
+    import pdfplumber
+    
+    # An older version of the same file will not be asked for again
+    for stale in [k for k in _plumber_docs if k[0] == pdf_path]:
+        _plumber_docs.pop(stale).close()
+    
+    pdf = _plumber_docs[key] = pdfplumber.open(pdf_path)
+    while len(_plumber_docs) > _PLUMBER_CACHE_SIZE:
+        _plumber_docs.popitem(last=False)[1].close()
+    return pdf
+
+
+def _close_all():
+    """Close every pdfplumber document opened through the cache"""
+    while _plumber_docs:
+        _plumber_docs.popitem()[1].close()
+
+
+atexit.register(_close_all)
+
+
+@lru_cache(maxsize=None)
+def _outline_border(left=False, right=False, bottom=False):
+    """Thin border on the given outer edges of the table"""
+    from openpyxl.styles import Border, Side
+    
+    thin = Side(style='thin', color='000000')
+    return Border(left=thin if left else None, right=thin if right else None, bottom=thin if bottom else None)
+
+
+@lru_cache(maxsize=None)
+def _get_styles(header_font_size=11, label_wrap=False):
+    """Build the workbook's named styles once per process (per header size / label wrapping)"""
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+    
+    header_fill = PatternFill(start_color="FFD966", end_color="FFD966", fill_type="solid")
+    header_font = Font(bold=True, color="000000", size=header_font_size)
+    
+    total_fill = PatternFill(start_color="FFE699", end_color="FFE699", fill_type="solid")
+    total_font = Font(bold=True, color="000000", size=10)
+    
+    border = Border(
+        left=Side(style='thin', color='000000'),
+        right=Side(style='thin', color='000000'),
+        top=Side(style='thin', color='000000'),
+        bottom=Side(style='thin', color='000000')
+    )
+    
+    # Data cells only carry the table outline; row labels always sit on its left edge
+    label_border = _outline_border(left=True)
+    
+    center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    left_align = Alignment(horizontal='left', vertical='center', wrap_text=label_wrap or None)
+    right_align = Alignment(horizontal='right', vertical='center')
+    
+    return (
+        NamedStyle(name='header', fill=header_fill, font=header_font, border=border, alignment=center_align),
+        NamedStyle(name='label', border=label_border, alignment=left_align),
+        NamedStyle(name='label_total', fill=total_fill, font=total_font, border=label_border, alignment=left_align),
+        NamedStyle(name='number', alignment=right_align, number_format='#,##0'),
+        NamedStyle(name='number_total', fill=total_fill, font=total_font, alignment=right_align, number_format='#,##0'),
+        NamedStyle(name='text', alignment=right_align),
+        NamedStyle(name='text_total', fill=total_fill, font=total_font, alignment=right_align),
+    )
 
 
 class BudimexPage8Extractor:
     """Extract Consolidated Statement of Changes in Equity (Page 8)"""
     
-    def __init__(self, pdf_path: str, output_path: str = "Budimex_Page8_Changes_in_Equity.xlsx"):
+    # Workbook layout; the per-script subclasses override these to keep their own sheet's look
+    SHEET_NAME = "Changes_in_Equity"
+    TOTAL_RE = _TOTAL_RE           # row labels styled as totals
+    WIDTH_MIN, WIDTH_PAD, WIDTH_CAP = 0, 3, 60   # column width = min(max(text, MIN) + PAD, CAP)
+    HEADER_HEIGHT = 30             # None leaves the header row at Excel's default height
+    HEADER_FONT_SIZE = 11
+    LABEL_WRAP = False             # wrap long row labels
+    
+    def __init__(self, pdf_path: str, output_path: str = "Budimex_Page8_Changes_in_Equity.xlsx",
+                 backend: str = "pymupdf", table_settings: dict = None, drop_empty_rows: bool = False,
+                 all_tables: bool = False):
         self.pdf_path = pdf_path
         self.output_path = output_path
+        self.backend = backend
+        self.table_settings = TABLE_SETTINGS if table_settings is None else table_settings
+        self.drop_empty_rows = drop_empty_rows
+        self.all_tables = all_tables
         self.headers = []
         self.data_rows = []
+        self._max_widths = []
     
     def extract_page_8(self):
-        """Extract page 8 table with exact values"""
+        """Extract page 8 table(s) with exact values"""
         print(f"🔄 Opening PDF: {self.pdf_path}")
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            print(f"📄 Total pages: {len(pdf.pages)}")
+        if self.backend == "pymupdf":
+            tables = self._extract_pymupdf()
+        elif self.backend == "pdfplumber":
+            tables = self._extract_pdfplumber()
+        else:
+            raise ValueError(f"Unknown backend: {self.backend}")
+        
+        if not tables:
+            return False
+        
+        # First table is the main statement; all_tables also gathers the rest of page 8
+        for table_idx, table in enumerate(tables if self.all_tables else tables[:1]):
+            if not table:
+                continue
+            
+            print(f"   Table {table_idx + 1} structure: {len(table)} rows × {len(table[0])} cols")
+            
+            # First row is headers (with several tables, the last table's headers are kept)
+            self.headers = [str(h).strip() if h else "" for h in table[0]]
+            self._max_widths += [0] * (len(self.headers) - len(self._max_widths))
+            for i, header in enumerate(self.headers):
+                if len(header) > self._max_widths[i]:
+                    self._max_widths[i] = len(header)
+            print(f"   Headers: {len(self.headers)} columns")
             
-            if len(pdf.pages) < 8:
-                print(f"❌ PDF has only {len(pdf.pages)} pages")
-                return False
+            # All other rows are data
+            for row_idx, row in enumerate(table[1:], 1):
+                # Convert row to strings and handle None values
+                cleaned_row = [
+                    "" if cell is None else str(cell).translate(_WS_TRANS).strip()
+                    for cell in row
+                ]
+                
+                # Pad with empty strings to match header count
+                while len(cleaned_row) < len(self.headers):
+                    cleaned_row.append("")
+                
+                # Trim excess columns
+                cleaned_row = cleaned_row[:len(self.headers)]
+                
+                # Track column widths while the row is at hand
+                for i, text in enumerate(cleaned_row):
+                    if len(text) > self._max_widths[i]:
+                        self._max_widths[i] = len(text)
+                
+                self.data_rows.append(cleaned_row)
+        
+        # Tables of different widths: pad everything to the widest so the sheet stays rectangular
+        n_cols = len(self._max_widths)
+        if len(self.headers) < n_cols or any(len(row) < n_cols for row in self.data_rows):
+            self.headers += [""] * (n_cols - len(self.headers))
+            self.data_rows = [row + [""] * (n_cols - len(row)) for row in self.data_rows]
+        
+        # Remove completely empty rows (rows are rectangular after padding, so mask them in one pass)
+        if self.drop_empty_rows and self.data_rows:
+            import numpy as np
+            
+            cells = np.asarray(self.data_rows, dtype=object)
+            self.data_rows = cells[(cells != "").any(axis=1)].tolist()
+        
+        print(f"   ✅ Extracted {len(self.data_rows)} data rows")
+        return True
+    
+    def _extract_pymupdf(self):
+        """Return the page-8 tables as raw rows, read with PyMuPDF"""
+        with _open_pdf(self.pdf_path) as doc:
+            if doc.page_count < 8:
+                print(f"❌ PDF has only {doc.page_count} pages")
+                return None
             
             # Extract page 8 (index 7)
-            page = pdf.pages[7]
-            tables = page.extract_tables()
+            page = doc.load_page(7)
+            tables = page.find_tables(**self.table_settings).tables
             
             if not tables:
                 print("❌ No tables found on page 8")
-                return False
+                return None
             
             print(f"📊 Found {len(tables)} table(s) on page 8")
             
-            # Process first table (main statement)
-            table = tables[0]
-            
-            print(f"   Table structure: {len(table)} rows × {len(table[0]) if table else 0} cols")
-            
-            # First row is headers
-            if table:
-                self.headers = [str(h).strip() if h else "" for h in table[0]]
-                print(f"   Headers: {len(self.headers)} columns")
-                
-                # All other rows are data
-                for row_idx, row in enumerate(table[1:], 1):
-                    # Convert row to strings and handle None values
-                    cleaned_row = []
-                    for cell in row:
-                        if cell is None:
-                            cleaned_row.append("")
-                        else:
-                            cleaned_row.append(str(cell).strip())
-                    
-                    # Pad with empty strings to match header count
-                    while len(cleaned_row) < len(self.headers):
-                        cleaned_row.append("")
-                    
-                    # Trim excess columns
-                    cleaned_row = cleaned_row[:len(self.headers)]
-                    
-                    self.data_rows.append(cleaned_row)
-                
-                print(f"   ✅ Extracted {len(self.data_rows)} data rows")
-                return True
+            return [table.extract() for table in (tables if self.all_tables else tables[:1])]
+    
+    def _extract_pdfplumber(self):
+        """Return the page-8 tables as raw rows, read with pdfplumber"""
+        # The parsed document is shared with any other extraction of the same file
+        pdf = _open_pdfplumber(self.pdf_path, os.path.getmtime(self.pdf_path))
+        if len(pdf.pages) < 8:
+            print(f"❌ PDF has only {len(pdf.pages)} pages")
+            return None
         
-        return False
+        tables = pdf.pages[7].extract_tables(self.table_settings)
+        
+        if not tables:
+            print("❌ No tables found on page 8")
+            return None
+        
+        print(f"📊 Found {len(tables)} table(s) on page 8")
+        
+        return tables
     
     def _is_total_or_subtotal(self, cell_value):
         """Check if row is a total or subtotal"""
         if not cell_value:
             return False
-        text = str(cell_value).lower()
-        keywords = ['balance', 'comprehensive', 'payment', 'contribution', 'sale']
-        return any(keyword in text for keyword in keywords)
+        return self.TOTAL_RE.search(str(cell_value)) is not None
     
-    def _try_parse_number(self, value):
-        """Try to parse a value as a number"""
-        if not value or not isinstance(value, str):
-            return value
+    def _parse_numeric_columns(self):
+        """Parse every column except the row labels into numbers, one vectorized pass per column"""
+        import pandas as pd
         
-        text = value.strip()
+        df = pd.DataFrame(self.data_rows, dtype=object)
         
-        # Handle empty
-        if text == "" or text == "-":
-            return None
-        
-        try:
-            # Handle negative values in parentheses: (123) -> -123
-            if text.startswith('(') and text.endswith(')'):
-                num_str = text[1:-1].replace(',', '').replace(' ', '')
-                return float(num_str) * -1
+        for col in df.columns[1:]:
+            text = df[col].astype(str).str.strip()
             
-            # Handle regular numbers with thousand separators
-            num_str = text.replace(',', '').replace(' ', '')
-            return float(num_str)
-        except (ValueError, AttributeError):
-            return text
+            # Drop thousand separators and spaces, then (123) -> -123
+            num_str = text.str.replace(r'[,\s]', '', regex=True).str.replace(r'^\((.*)\)$', r'-\1', regex=True)
+            values = pd.to_numeric(num_str, errors='coerce')
+            
+            # Cells that are not numbers stay as text; a lone dash means empty
+            parsed = text.astype(object).where(values.isna(), values)
+            parsed[text == "-"] = None
+            df[col] = parsed
+        
+        return df
+    
+    def save(self):
+        """Write the table in the format given by the output file's suffix"""
+        if os.path.splitext(self.output_path)[1].lower() in (".csv", ".parquet"):
+            return self.create_data_file()
+        return self.create_excel_file()
+    
+    def create_data_file(self):
+        """Write the parsed table as plain CSV or Parquet (no Excel styling)"""
+        if not self.headers or not self.data_rows:
+            print("❌ No data to export")
+            return False
+        
+        print(f"\n📝 Creating data file: {self.output_path}")
+        
+        import pandas as pd
+        
+        df = self._parse_numeric_columns()
+        
+        # Column names must be unique: blank headers get a placeholder, repeats (e.g. two "2024" columns) a suffix
+        columns = []
+        for col_idx, header in enumerate(self.headers, 1):
+            name = base = header or f"column_{col_idx}"
+            suffix = 2
+            while name in columns:
+                name = f"{base}_{suffix}"
+                suffix += 1
+            columns.append(name)
+        df.columns = columns
+        
+        if self.output_path.lower().endswith(".parquet"):
+            # Parquet columns need one type: keep all-numeric columns as numbers, the rest as text
+            for col_idx in range(df.shape[1]):
+                cells = df.iloc[:, col_idx].replace("", None)
+                values = pd.to_numeric(cells, errors='coerce')
+                df.isetitem(col_idx, values if values.count() == cells.count() else cells.astype("string"))
+            df.to_parquet(self.output_path, engine='pyarrow', compression='snappy', index=False)
+        else:
+            df.to_csv(self.output_path, index=False)
+        
+        print(f"✅ Data file saved: {self.output_path}")
+        print(f"   📊 Data: {len(self.data_rows)} rows × {len(self.headers)} columns")
+        
+        return True
     
     def create_excel_file(self):
         """Create Excel file with proper formatting"""
@@ -108,82 +326,76 @@ class BudimexPage8Extractor:
         
         print(f"\n📝 Creating Excel file: {self.output_path}")
         
-        # Create workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Changes_in_Equity"
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils import get_column_letter
         
-        # Define styles
-        header_fill = PatternFill(start_color="FFD966", end_color="FFD966", fill_type="solid")
-        header_font = Font(bold=True, color="000000", size=11)
+        # Create write-only workbook (rows are streamed straight to the file)
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(self.SHEET_NAME)
         
-        total_fill = PatternFill(start_color="FFE699", end_color="FFE699", fill_type="solid")
-        total_font = Font(bold=True, color="000000", size=10)
+        # Sheet layout has to be set before the first row is appended
+        # Auto-adjust column widths (tracked while the rows were cleaned);
+        # neighbouring columns of equal width share one <col min..max> entry
+        col_idx = 1
+        widths = (min(max(max_length, self.WIDTH_MIN) + self.WIDTH_PAD, self.WIDTH_CAP) for max_length in self._max_widths)
+        for adjusted_width, run in groupby(widths):
+            span = len(list(run))
+            dim = ws.column_dimensions[get_column_letter(col_idx)]
+            dim.width = adjusted_width
+            dim.min, dim.max = col_idx, col_idx + span - 1
+            col_idx += span
         
-        border = Border(
-            left=Side(style='thin', color='000000'),
-            right=Side(style='thin', color='000000'),
-            top=Side(style='thin', color='000000'),
-            bottom=Side(style='thin', color='000000')
-        )
+        # Set header row height
+        if self.HEADER_HEIGHT is not None:
+            ws.row_dimensions[1].height = self.HEADER_HEIGHT
+        
+        # Freeze header row
+        ws.freeze_panes = "A2"
+        
+        # Register named styles once; cells then only reference them by name
+        for style in _get_styles(self.HEADER_FONT_SIZE, self.LABEL_WRAP):
+            wb.add_named_style(style)
         
         # Write header row
-        for col_idx, header in enumerate(self.headers, 1):
-            cell = ws.cell(row=1, column=col_idx)
-            cell.value = header
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.border = border
-            cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+        header_cells = []
+        for header in self.headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.style = 'header'
+            header_cells.append(cell)
+        ws.append(header_cells)
         
         # Write data rows
-        for row_idx, row_data in enumerate(self.data_rows, 2):
+        last_row = len(self.data_rows) - 1
+        last_col = len(self.headers)
+        for row_idx, row_data in enumerate(self._parse_numeric_columns().itertuples(index=False, name=None)):
+            # Pick the style set for the whole row: bold if total/subtotal
+            if self._is_total_or_subtotal(row_data[0]):
+                label_style, number_style, text_style = 'label_total', 'number_total', 'text_total'
+            else:
+                label_style, number_style, text_style = 'label', 'number', 'text'
+            
+            row_cells = []
             for col_idx, value in enumerate(row_data, 1):
-                cell = ws.cell(row=row_idx, column=col_idx)
-                
                 # First column: text (row labels)
                 if col_idx == 1:
-                    cell.value = value
-                    cell.alignment = Alignment(horizontal='left', vertical='center')
-                    cell.border = border
-                    
-                    # Bold if total/subtotal
-                    if self._is_total_or_subtotal(value):
-                        cell.font = total_font
-                        cell.fill = total_fill
+                    cell = WriteOnlyCell(ws, value=value)
+                    cell.style = label_style
                 else:
-                    # Other columns: try to parse as numbers
-                    parsed_value = self._try_parse_number(value)
-                    cell.value = parsed_value
-                    cell.alignment = Alignment(horizontal='right', vertical='center')
-                    cell.border = border
+                    # Other columns: already parsed as numbers where possible
+                    cell = WriteOnlyCell(ws, value=value)
                     
                     # Format numbers
-                    if isinstance(parsed_value, (int, float)):
-                        cell.number_format = '#,##0'
-                    
-                    # Bold if total/subtotal
-                    if self._is_total_or_subtotal(row_data[0]):
-                        cell.font = total_font
-                        cell.fill = total_fill
-        
-        # Auto-adjust column widths
-        for col_idx, header in enumerate(self.headers, 1):
-            max_length = len(str(header))
-            
-            for row_data in self.data_rows:
-                if col_idx <= len(row_data):
-                    cell_len = len(str(row_data[col_idx - 1]))
-                    max_length = max(max_length, cell_len)
-            
-            adjusted_width = min(max_length + 3, 60)
-            ws.column_dimensions[get_column_letter(col_idx)].width = adjusted_width
-        
-        # Set header row height
-        ws.row_dimensions[1].height = 30
-        
-        # Freeze header row
-        ws.freeze_panes = "A2"
+                    if isinstance(value, (int, float)):
+                        cell.style = number_style
+                    else:
+                        cell.style = text_style
+                
+                # Close the table outline on its right and bottom edges
+                if col_idx == last_col or row_idx == last_row:
+                    cell.border = _outline_border(col_idx == 1, col_idx == last_col, row_idx == last_row)
+                row_cells.append(cell)
+            ws.append(row_cells)
         
         # Save workbook
         wb.save(self.output_path)
@@ -194,23 +406,49 @@ class BudimexPage8Extractor:
         return True
 
 
-def main():
-    pdf_file = "2024_Budimex.pdf"
-    output_file = "Budimex_Page8_Changes_in_Equity.xlsx"
-    
+def _extract_one(pdf_file, output_file, backend="pymupdf", extractor_cls=None):
+    """Extract page 8 of one PDF into its output file (module-level so worker processes can run it)"""
     if not os.path.exists(pdf_file):
         print(f"❌ Error: {pdf_file} not found")
-        return
+        return False
     
-    extractor = BudimexPage8Extractor(pdf_file, output_file)
+    extractor = (extractor_cls or BudimexPage8Extractor)(pdf_file, output_file, backend)
     
-    print("\n🚀 EXTRACTING PAGE 8: Consolidated Statement of Changes in Equity\n")
+    print(f"\n🚀 EXTRACTING PAGE 8: Consolidated Statement of Changes in Equity ({pdf_file})\n")
     
     if extractor.extract_page_8():
-        if extractor.create_excel_file():
+        if extractor.save():
             print(f"\n✨ SUCCESS! File: {output_file}")
+            return True
     else:
         print("\n❌ Extraction failed")
+    return False
+
+
+def main(extractor_cls=None, output_name="Page8_Changes_in_Equity"):
+    """CLI; the entry-point scripts pass their own extractor defaults and output file name"""
+    parser = argparse.ArgumentParser(description="Extract the page-8 Statement of Changes in Equity to Excel, CSV or Parquet")
+    parser.add_argument("pdf_files", nargs="*", default=["2024_Budimex.pdf"], help="PDF file(s) to process")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes for batch runs")
+    parser.add_argument("--backend", choices=["pymupdf", "pdfplumber"], default="pymupdf", help="PDF table extraction library")
+    parser.add_argument("--format", choices=["xlsx", "csv", "parquet"], default="xlsx", help="output file format (csv/parquet skip Excel styling)")
+    args = parser.parse_args()
+    
+    if len(args.pdf_files) == 1:
+        tasks = [(args.pdf_files[0], f"Budimex_{output_name}.{args.format}")]
+    else:
+        tasks = [(pdf, f"{os.path.splitext(pdf)[0]}_{output_name}.{args.format}") for pdf in args.pdf_files]
+    
+    extract_one = partial(_extract_one, backend=args.backend, extractor_cls=extractor_cls)
+    
+    if args.jobs <= 1 or len(tasks) == 1:
+        for pdf_file, output_file in tasks:
+            extract_one(pdf_file, output_file)
+        return
+    
+    # Each PDF is independent, so fan out across processes
+    with ProcessPoolExecutor(max_workers=min(args.jobs, len(tasks))) as executor:
+        list(executor.map(extract_one, *zip(*tasks)))
 
 
 if __name__ == "__main__":
@@ -1,17 +1,147 @@
 import pdfplumber
 import pandas as pd
+import numpy as np
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache, partial
+from itertools import groupby
+import hashlib
 import os
+import pickle
+import shutil
+
+from numeric_columns import convert_numeric_columns
+
+try:
+    import tablers  # Rust table finder, much faster than pdfplumber when installed
+except ImportError:
+    tablers = None
+
+
+# Columns written right-aligned with a number format
+NUMERIC_COLUMNS = {'2022', '2023', '2024', '2022_check', '2023_check', '2024_check',
+                   'base_factor', 'display_power_factor'}
+
+# Standard-schema columns that always hold whole numbers
+INTEGER_COLUMNS = {'primary_key', 'doc_page_num', 'file_page_num', 'indentation', 'process_flag',
+                   'base_factor', 'display_power_factor', 'cumulative_periods'}
+
+# Smallest run of pages worth handing to a separate worker process
+PAGES_PER_WORKER = 8
+
+# Raw tables per page are cached here so unchanged PDFs are not parsed again
+# (set PDF_EXTRACTOR_NO_CACHE=1 to turn the cache off, clear_page_cache() to empty it)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pdf-extractor")
+
+# Table-finder options; they are part of the cache key, so changing them invalidates cached pages
+TABLERS_OPTIONS = {'min_rows': 2, 'min_columns': 2}
+PDFPLUMBER_TABLE_SETTINGS = {}
+
+
+@lru_cache(maxsize=None)
+def _get_styles():
+    """Build the workbook's named styles once per process"""
+    header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=10)
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    left_align = Alignment(horizontal='left', vertical='center', wrap_text=True)
+    right_align = Alignment(horizontal='right', vertical='center')
+    
+    return (
+        # Only the header row is bordered; body cells rely on the sheet gridlines
+        NamedStyle(name='header', fill=header_fill, font=header_font, border=border, alignment=center_align),
+        NamedStyle(name='num_body', alignment=right_align, number_format='#,##0'),
+        NamedStyle(name='num_text', alignment=right_align),
+        NamedStyle(name='txt_body', alignment=left_align),
+    )
+
+
+@contextmanager
+def _open_pdf(pdf_path):
+    """Open the PDF with tablers if available (else pdfplumber); yields (page_count, page_index -> raw tables)"""
+    if tablers is not None:
+        doc = tablers.Document(pdf_path)
+        
+        def find_tables(page_idx):
+            page = doc.get_page(page_idx)
+            tables = tablers.find_tables(page, **TABLERS_OPTIONS)
+            tables = [[[cell.text if cell is not None else None for cell in row.cells] for row in table.rows] for table in tables]
+            page.clear_cache()  # Drop the page's parsed objects once its tables are read
+            return tables
+        
+        try:
+            yield doc.page_count, find_tables
+        finally:
+            doc.close()
+    else:
+        with pdfplumber.open(pdf_path, laparams=None) as pdf:
+            def find_tables(page_idx):
+                page = pdf.pages[page_idx]
+                # The default "lines" strategy builds tables from ruling edges, so a page
+                # without any can't hold one; skip word extraction and cell finding there
+                tables = page.extract_tables(PDFPLUMBER_TABLE_SETTINGS) if page.edges else []
+                page.close()  # Flush the page's cached chars/lines/rects so memory stays at one page
+                return tables
+            
+            yield len(pdf.pages), find_tables
+
+
+def _page_cache_dir(pdf_path):
+    """Cache directory for one PDF's raw tables, keyed on the file's MD5 and the table finder's name, version and options"""
+    with open(pdf_path, 'rb') as f:
+        pdf_hash = hashlib.file_digest(f, 'md5').hexdigest()
+    
+    finder, options = (tablers, TABLERS_OPTIONS) if tablers is not None else (pdfplumber, PDFPLUMBER_TABLE_SETTINGS)
+    options_hash = hashlib.md5(repr(sorted(options.items())).encode()).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, pdf_hash, f"{finder.__name__}-{finder.__version__}-{options_hash}")
+
+
+def clear_page_cache():
+    """Delete every cached page table"""
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+def _load_cached_page(cache_dir, page_idx):
+    """Raw tables of a page from the disk cache, or None if not cached"""
+    try:
+        with open(os.path.join(cache_dir, f"page_{page_idx + 1}.pkl"), 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def _save_cached_page(cache_dir, page_idx, tables):
+    """Store a page's raw tables in the disk cache"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"page_{page_idx + 1}.pkl")
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+
+
+def _extract_pages(pdf_path, page_indexes):
+    """Raw tables for a run of pages, opening the PDF once (module-level so worker processes can run it)"""
+    with _open_pdf(pdf_path) as (page_count, find_tables):
+        return [find_tables(page_idx) for page_idx in page_indexes]
 
 
 class FinancialStatementExtractorSingleSheet:
     
-    def __init__(self, pdf_path: str, output_path: str = "financial_statements.xlsx"):
+    def __init__(self, pdf_path: str, output_path: str = "financial_statements.xlsx", use_cache: bool = True):
         self.pdf_path = pdf_path
         self.output_path = output_path
+        self.use_cache = use_cache and os.environ.get("PDF_EXTRACTOR_NO_CACHE") != "1"
         self.extracted_tables = []
         self.table_metadata = []
         
@@ -43,22 +173,18 @@ class FinancialStatementExtractorSingleSheet:
             # Extract text with positions
             words = page.extract_words()
             
-            # Group words by vertical position (rows)
-            rows_dict = {}
-            for word in words:
-                y_pos = round(word['top'])
-                if y_pos not in rows_dict:
-                    rows_dict[y_pos] = []
-                rows_dict[y_pos].append(word)
-            
-            # Sort rows by vertical position
-            sorted_rows = sorted(rows_dict.items(), key=lambda x: x[0])
+            # Group words by vertical position (rows): sort by (rounded top, x0)
+            # in one pass, then split wherever the rounded top changes
+            tops = np.rint(np.fromiter((w['top'] for w in words), dtype=np.float64, count=len(words))).astype(np.int64)
+            x0s = np.fromiter((w['x0'] for w in words), dtype=np.float64, count=len(words))
+            order = np.lexsort((x0s, tops))
+            _, row_starts = np.unique(tops[order], return_index=True)
+            sorted_rows = np.split(order, row_starts[1:])
             
             # Build table rows
             table_data = []
-            for y_pos, words_in_row in sorted_rows:
-                # Sort words by horizontal position
-                sorted_words = sorted(words_in_row, key=lambda w: w['x0'])
+            for row_order in sorted_rows:
+                sorted_words = [words[i] for i in row_order]
                 
                 # Join words into cells based on position
                 row_text = ' '.join([w['text'] for w in sorted_words])
@@ -110,27 +236,54 @@ class FinancialStatementExtractorSingleSheet:
         """Extract all tables from entire PDF"""
         print(f"🔄 Opening PDF: {self.pdf_path}")
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            print(f"📄 Total pages: {len(pdf.pages)}")
+        cache_dir = _page_cache_dir(self.pdf_path) if self.use_cache else None
+        
+        with _open_pdf(self.pdf_path) as (page_count, find_tables):
+            print(f"📄 Total pages: {page_count}")
+            
+            # Pages parsed on an earlier run come straight from the disk cache
+            if cache_dir:
+                page_tables = [_load_cached_page(cache_dir, page_idx) for page_idx in range(page_count)]
+            else:
+                page_tables = [None] * page_count
+            missing = [page_idx for page_idx, tables in enumerate(page_tables) if tables is None]
+            if len(missing) < page_count:
+                print(f"💾 {page_count - len(missing)} page(s) loaded from cache")
             
-            for page_num, page in enumerate(pdf.pages, 1):
-                tables = page.extract_tables()
+            # Pages are independent: split larger PDFs into runs of pages across processes
+            n_workers = min(os.cpu_count() or 1, -(-len(missing) // PAGES_PER_WORKER))
+            if n_workers <= 1:
+                for page_idx in missing:
+                    page_tables[page_idx] = find_tables(page_idx)
+        
+        if n_workers > 1:
+            run_length = -(-len(missing) // n_workers)
+            runs = [missing[start:start + run_length] for start in range(0, len(missing), run_length)]
+            with ProcessPoolExecutor(max_workers=len(runs)) as executor:
+                for run, run_tables in zip(runs, executor.map(partial(_extract_pages, self.pdf_path), runs)):
+                    for page_idx, tables in zip(run, run_tables):
+                        page_tables[page_idx] = tables
+        
+        if cache_dir:
+            for page_idx in missing:
+                _save_cached_page(cache_dir, page_idx, page_tables[page_idx])
+        
+        for page_num, tables in enumerate(page_tables, 1):
+            if tables:
+                print(f"📊 Found {len(tables)} table(s) on page {page_num}")
                 
-                if tables:
-                    print(f"📊 Found {len(tables)} table(s) on page {page_num}")
+                for table_idx, table in enumerate(tables):
+                    df = self._convert_table_to_dataframe(table)
                     
-                    for table_idx, table in enumerate(tables):
-                        df = self._convert_table_to_dataframe(table)
-                        
-                        if df is not None and not df.empty:
-                            self.extracted_tables.append(df)
-                            self.table_metadata.append({
-                                'page': page_num,
-                                'table_index': table_idx,
-                                'rows': len(df),
-                                'columns': len(df.columns)
-                            })
-                            print(f"✅ Table {len(self.extracted_tables)}: Page {page_num}, {len(df)} rows × {len(df.columns)} columns")
+                    if df is not None and not df.empty:
+                        self.extracted_tables.append(df)
+                        self.table_metadata.append({
+                            'page': page_num,
+                            'table_index': table_idx,
+                            'rows': len(df),
+                            'columns': len(df.columns)
+                        })
+                        print(f"✅ Table {len(self.extracted_tables)}: Page {page_num}, {len(df)} rows × {len(df.columns)} columns")
         
         return self.extracted_tables
     
@@ -141,18 +294,13 @@ class FinancialStatementExtractorSingleSheet:
         
         try:
             headers = table[0]
-            data_rows = table[1:]
-            data_rows = [row for row in data_rows if any(cell for cell in row)]
+            max_cols = len(headers)
             
-            if not data_rows:
-                return None
+            # Drop empty rows and pad/trim the rest to the header width in one pass
+            padded_rows = [(row + [""] * (max_cols - len(row)))[:max_cols] for row in table[1:] if any(row)]
             
-            max_cols = len(headers)
-            padded_rows = []
-            for row in data_rows:
-                while len(row) < max_cols:
-                    row.append("")
-                padded_rows.append(row[:max_cols])
+            if not padded_rows:
+                return None
             
             df = pd.DataFrame(padded_rows, columns=headers)
             df = self._clean_dataframe(df)
@@ -166,15 +314,17 @@ class FinancialStatementExtractorSingleSheet:
         """Clean DataFrame"""
         df = df.dropna(how='all')
         df = df.dropna(axis=1, how='all')
-        df = df.map(lambda x: x.strip() if isinstance(x, str) else x)
+        # Strip text columns with the vectorized .str accessor instead of a per-cell lambda
+        for col_idx in range(df.shape[1]):
+            col = df.iloc[:, col_idx]
+            if pd.api.types.infer_dtype(col, skipna=True) == 'string':
+                df.isetitem(col_idx, col.str.strip())
         df = df.replace('', None)
         return df.reset_index(drop=True)
     
     def convert_numeric_columns(self):
         """Convert numeric columns"""
-        for df in self.extracted_tables:
-            for col in df.columns:
-                df[col] = df[col].apply(lambda x: self._convert_to_numeric(x))
+        convert_numeric_columns(self.extracted_tables, self._convert_to_numeric)
     
     # def _convert_to_numeric(self, value):
     #     """Convert value to numeric: remove spaces/commas, handle parentheses"""
@@ -244,7 +394,7 @@ class FinancialStatementExtractorSingleSheet:
                 inner = inner.replace(',', '').replace(' ', '').replace('\xa0', '')
                 num = float(inner)
                 return -num  # Return as numeric, not string
-            except:
+            except ValueError:
                 return value_str
         
         # Try to convert regular number
@@ -253,9 +403,8 @@ class FinancialStatementExtractorSingleSheet:
             clean_value = value_str.replace(',', '').replace(' ', '').replace('\xa0', '')
             # Try to parse as float
             num = float(clean_value)
-            print("fixed values are " + num)
             return num  # Return as numeric, not string
-        except:
+        except ValueError:
             # Not a number, return as-is (text)
             return value_str
 
@@ -263,72 +412,62 @@ class FinancialStatementExtractorSingleSheet:
         """Transform to standard schema"""
         print(f"\n📝 Transforming {len(self.extracted_tables)} table(s) to standardized schema...")
         
-        transformed_data = []
-        primary_key_counter = 1
-        
+        # Preallocate one typed array per output column and fill it in place;
+        # object arrays start out as None, so empty fields need no work
+        total_rows = sum(len(df) for df in self.extracted_tables)
+        arrays = {col: np.empty(total_rows, dtype=np.int64 if col in INTEGER_COLUMNS else object)
+                  for col in self.standard_columns}
+        
+        today = datetime.now().strftime('%Y-%m-%d')
+        arrays['primary_key'][:] = np.arange(1, total_rows + 1)
+        arrays['date_last_updated'][:] = today
+        arrays['published_date'][:] = today
+        arrays['reported_date'][:] = '2024-12-31'
+        arrays['country'][:] = 'PL'
+        arrays['source_metric_name'][:] = "PDF_Extracted"
+        arrays['indentation'][:] = 0
+        arrays['process_flag'][:] = 1
+        arrays['base_factor'][:] = 1
+        arrays['display_power_factor'][:] = 0
+        arrays['data_frequency'][:] = 'Annual'
+        arrays['aggregation_method'][:] = 'Sum'
+        arrays['unit'][:] = 'PLN'
+        arrays['unit_type'][:] = 'Thousands'
+        arrays['cumulative_periods'][:] = 1
+        
+        offset = 0
         for table_idx, (df, metadata) in enumerate(zip(self.extracted_tables, self.table_metadata)):
             print(f"\n📊 Processing Table {table_idx + 1} (Page {metadata['page']})")
             
-            for row_idx, row in enumerate(df.itertuples(index=False)):
-                row_data = {}
-                row_data['primary_key'] = primary_key_counter
-                row_data['date_last_updated'] = datetime.now().strftime('%Y-%m-%d')
-                row_data['published_date'] = datetime.now().strftime('%Y-%m-%d')
-                row_data['reported_date'] = '2024-12-31'
-                row_data['doc_page_num'] = metadata['page']
-                row_data['file_page_num'] = metadata['page']
-                row_data['table_id'] = f"TABLE_{table_idx + 1:03d}"
-                row_data['country'] = 'PL'
-                
-                for field in ['geo_1_id', 'geo_1_name', 'geo_1_type', 'geo_2_id', 'geo_2_name', 'geo_2_type']:
-                    row_data[field] = None
-                
-                extracted_cols = list(row)
-                
-                for i in range(1, 5):
-                    if len(extracted_cols) >= i:
-                        row_data[f'dim_{i}_id'] = f"DIM{i}_{table_idx}_{row_idx}"
-                        row_data[f'dim_{i}_name'] = str(extracted_cols[i-1])
-                    else:
-                        row_data[f'dim_{i}_id'] = None
-                        row_data[f'dim_{i}_name'] = None
-                
-                row_data['metric_id'] = f"METRIC_{table_idx}_{row_idx}"
-                row_data['metric_name'] = f"Value_{row_idx}"
-                row_data['source_metric_id'] = f"SOURCE_{table_idx}_{row_idx}"
-                row_data['source_metric_name'] = "PDF_Extracted"
-                row_data['indentation'] = 0
-                row_data['process_flag'] = 1
-                row_data['base_factor'] = 1
-                row_data['display_power_factor'] = 0
-                row_data['data_frequency'] = 'Annual'
-                row_data['aggregation_method'] = 'Sum'
-                row_data['unit'] = 'PLN'
-                row_data['unit_type'] = 'Thousands'
-                row_data['note_id'] = None
-                row_data['note_reference'] = None
-                row_data['cumulative_periods'] = 1
-                row_data['comments'] = f"Extracted from page {metadata['page']}"
-                
-                for year in ['2022', '2023', '2024']:
-                    row_data[year] = None
-                    row_data[f'{year}_check'] = None
-                
-                if len(extracted_cols) >= 4:
-                    row_data['2024'] = extracted_cols[-1]
-                if len(extracted_cols) >= 5:
-                    row_data['2023'] = extracted_cols[-2]
-                if len(extracted_cols) >= 6:
-                    row_data['2022'] = extracted_cols[-3]
-                
-                row_data['check_sum'] = None
-                row_data['concat'] = None
-                row_data['formula'] = None
-                
-                transformed_data.append(row_data)
-                primary_key_counter += 1
+            n = len(df)
+            n_cols = len(df.columns)
+            page = metadata['page']
+            rows = slice(offset, offset + n)
+            row_ids = np.arange(n).astype(str)
+            
+            arrays['doc_page_num'][rows] = page
+            arrays['file_page_num'][rows] = page
+            arrays['table_id'][rows] = f"TABLE_{table_idx + 1:03d}"
+            
+            for i in range(1, min(n_cols, 4) + 1):
+                arrays[f'dim_{i}_id'][rows] = np.char.add(f"DIM{i}_{table_idx}_", row_ids)
+                arrays[f'dim_{i}_name'][rows] = df.iloc[:, i - 1].map(str).to_numpy(dtype=object)
+            
+            arrays['metric_id'][rows] = np.char.add(f"METRIC_{table_idx}_", row_ids)
+            arrays['metric_name'][rows] = np.char.add("Value_", row_ids)
+            arrays['source_metric_id'][rows] = np.char.add(f"SOURCE_{table_idx}_", row_ids)
+            arrays['comments'][rows] = f"Extracted from page {page}"
+            
+            # Year values come from the last three extracted columns
+            for year, offset_col, min_cols in [('2024', -1, 4), ('2023', -2, 5), ('2022', -3, 6)]:
+                if n_cols >= min_cols:
+                    arrays[year][rows] = df.iloc[:, offset_col].to_numpy(dtype=object)
+            
+            offset += n
         
-        result_df = pd.DataFrame(transformed_data, columns=self.standard_columns)
+        # Create DataFrame with standard columns; infer_objects gives the year columns
+        # the same float dtype (blank -> NaN) the old row-by-row build ended up with
+        result_df = pd.DataFrame(arrays, columns=self.standard_columns, copy=False).infer_objects()
         print(f"✅ Transformed {len(result_df)} rows")
         return result_df
     
@@ -383,70 +522,62 @@ class FinancialStatementExtractorSingleSheet:
         """Create Excel file with all data in a SINGLE SHEET"""
         print(f"\n📝 Creating Excel file with single sheet: {self.output_path}")
         
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Consolidated_Data"
-        
-        # Styles
-        header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=10)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        left_align = Alignment(horizontal='left', vertical='center', wrap_text=True)
-        right_align = Alignment(horizontal='right', vertical='center')
+        # Write-only workbook: rows are streamed to disk instead of kept as Cell objects
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Consolidated_Data")
         
-        # Write headers
-        for col_idx, header in enumerate(transformed_df.columns, 1):
-            cell = ws.cell(row=1, column=col_idx)
-            cell.value = header
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.border = border
-            cell.alignment = center_align
-        
-        # Write data
-        for row_idx, row in enumerate(transformed_df.values, 2):
-            for col_idx, value in enumerate(row, 1):
-                cell = ws.cell(row=row_idx, column=col_idx)
-                
-                # Get column name
-                col_name = transformed_df.columns[col_idx - 1]
-                
-                # Clean and convert numeric values before writing
-                if col_name in ['2022', '2023', '2024', '2022_check', '2023_check', '2024_check', 
-                            'base_factor', 'display_power_factor']:
-                    # Apply conversion again to ensure it's numeric
-                    converted_value = self._convert_to_numeric(value)
-                    cell.value = converted_value
-                    cell.alignment = right_align
-                    
-                    # Apply number format ONLY if it's actually a number
-                    if isinstance(converted_value, (int, float)) and converted_value is not None:
-                        cell.number_format = '#,##0'
-                else:
-                    cell.value = value
-                    cell.alignment = left_align
-                
-                cell.border = border
+        # Register named styles once; cells then only reference them by name
+        for style in _get_styles():
+            wb.add_named_style(style)
         
-        # Auto-adjust column widths
-        for col_idx, column in enumerate(transformed_df.columns, 1):
-            col_name = transformed_df.columns[col_idx - 1]
+        # Sheet layout has to be set before the first row is appended
+        # Auto-adjust column widths; neighbouring columns of equal width share one <col min..max> entry
+        widths = []
+        for col_name in transformed_df.columns:
             if col_name in ['2022', '2023', '2024', '2022_check', '2023_check', '2024_check']:
-                ws.column_dimensions[get_column_letter(col_idx)].width = 15
+                widths.append(15)
             elif col_name in ['primary_key', 'table_id', 'country']:
-                ws.column_dimensions[get_column_letter(col_idx)].width = 12
+                widths.append(12)
             else:
-                ws.column_dimensions[get_column_letter(col_idx)].width = 20
+                widths.append(20)
+        
+        col_idx = 1
+        for width, run in groupby(widths):
+            span = len(list(run))
+            dim = ws.column_dimensions[get_column_letter(col_idx)]
+            dim.width = width
+            dim.min, dim.max = col_idx, col_idx + span - 1
+            col_idx += span
         
         # Freeze header row
         ws.freeze_panes = 'A2'
         
+        # Write headers
+        header_cells = []
+        for header in transformed_df.columns:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.style = 'header'
+            header_cells.append(cell)
+        ws.append(header_cells)
+        
+        # Decide once per column whether it holds numbers
+        is_numeric = [col_name in NUMERIC_COLUMNS for col_name in transformed_df.columns]
+        
+        # Write data (values were already parsed by convert_numeric_columns)
+        for row in transformed_df.itertuples(index=False, name=None):
+            row_cells = []
+            for value, numeric in zip(row, is_numeric):
+                if numeric and pd.isna(value):
+                    value = None  # blank year cells are NaN in the float columns; leave them empty
+                cell = WriteOnlyCell(ws, value=value)
+                if numeric:
+                    # Apply number format ONLY if it's actually a number
+                    cell.style = 'num_body' if isinstance(value, (int, float)) else 'num_text'
+                else:
+                    cell.style = 'txt_body'
+                row_cells.append(cell)
+            ws.append(row_cells)
+        
         wb.save(self.output_path)
         print(f"✅ Excel file saved: {self.output_path}")
         print(f"📊 Total rows in sheet: {len(transformed_df)}")